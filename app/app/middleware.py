@@ -0,0 +1,62 @@
+import re
+
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is used on its own without it
+    brotli = None
+
+re_accepts_brotli = re.compile(r'\bbr\b')
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compress HTML and JSON responses. JSON is sent with brotli if the browser
+    accepts it and the brotli package is installed.
+
+    HTML always goes through GZipMiddleware, whose random-length padding is
+    the BREACH mitigation for the CSRF tokens in our pages; brotli output has
+    no such padding.
+    """
+
+    content_types = ('text/html', 'application/json')
+    brotli_content_types = ('application/json',)
+    brotli_quality = 5
+
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if content_type not in self.content_types:
+            return response
+
+        ae = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if (
+            brotli is None
+            or content_type not in self.brotli_content_types
+            or response.streaming
+            or not re_accepts_brotli.search(ae)
+        ):
+            return super().process_response(request, response)
+
+        # It's not worth attempting to compress really short responses.
+        if len(response.content) < 200 or response.has_header('Content-Encoding'):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        # Return the compressed content only if it's actually shorter.
+        compressed_content = brotli.compress(
+            response.content, mode=brotli.MODE_TEXT, quality=self.brotli_quality
+        )
+        if len(compressed_content) >= len(response.content):
+            return response
+        response.content = compressed_content
+        response.headers['Content-Length'] = str(len(response.content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+
+        return response
@@ -0,0 +1,60 @@
+"""
+Production settings for app project.
+
+Run with DJANGO_SETTINGS_MODULE=app.settings_production. Everything not
+overridden here comes from app.settings.
+
+See https://docs.djangoproject.com/en/3.2/howto/deployment/checklist/
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, MIDDLEWARE, TEMPLATES
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+DEBUG = False
+
+ALLOWED_HOSTS = [host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
+
+
+# Compress HTML and JSON responses (see app.middleware). It must run before
+# anything that reads or sets the response body.
+MIDDLEWARE = list(MIDDLEWARE)
+MIDDLEWARE.insert(
+    MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
+    'app.middleware.CompressionMiddleware',
+)
+
+
+# Templates are compiled once per worker and kept in memory. The cached
+# loader replaces APP_DIRS, so the app directories loader is listed here.
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+
+# Static files are collected with hashed names plus .gz/.br siblings, so the
+# front-end server can send them precompressed (e.g. nginx gzip_static).
+STATIC_ROOT = os.environ.get('DJANGO_STATIC_ROOT', BASE_DIR / 'staticfiles')
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'app.storage.CompressedManifestStaticFilesStorage',
+    },
+}
@@ -0,0 +1,50 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, only .gz files are written without it
+    brotli = None
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Write .gz (and .br, if brotli is installed) siblings of every collected
+    text asset, so the front-end server can send them without compressing
+    on each request.
+    """
+
+    compressible_extensions = ('.css', '.js', '.svg', '.txt', '.json', '.map', '.html', '.xml')
+
+    def post_process(self, paths, dry_run=False, **options):
+        # Adjustable files (CSS) are yielded once per pass, with a new hashed
+        # name each time; only the last one ends up in the manifest.
+        hashed_names = {}
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names[name] = hashed_name
+            yield name, hashed_name, processed
+
+        for hashed_name in hashed_names.values():
+            self.compress(hashed_name)
+
+    def compress(self, name):
+        if not name.endswith(self.compressible_extensions):
+            return
+        with self.open(name) as f:
+            content = f.read()
+
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+        if len(compressed) < len(content):
+            self._save_compressed(name + '.gz', compressed)
+        if brotli is not None:
+            compressed = brotli.compress(content, quality=11)
+            if len(compressed) < len(content):
+                self._save_compressed(name + '.br', compressed)
+
+    def _save_compressed(self, name, content):
+        if self.exists(name):
+            self.delete(name)
+        self._save(name, ContentFile(content))
@@ -0,0 +1,174 @@
+import gzip
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from unittest import mock, skipIf
+
+from django.conf import settings
+from django.core.management import call_command
+from django.http import HttpResponse, JsonResponse
+from django.template import engines
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from .middleware import CompressionMiddleware, brotli
+from .storage import CompressedManifestStaticFilesStorage
+from .warmup import warm_up
+
+PAGE = '<html><body>' + 'Lorem ipsum dolor sit amet. ' * 50 + '</body></html>'
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    def compress(self, response, accept_encoding):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_html_is_gzipped_even_if_brotli_is_accepted(self):
+        """
+        HTML keeps GZipMiddleware's BREACH padding, never brotli.
+        """
+        response = self.compress(HttpResponse(PAGE), 'gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content).decode(), PAGE)
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    @skipIf(brotli is None, 'brotli is not installed')
+    def test_json_is_brotli_compressed(self):
+        """
+        JSON is compressed with brotli when the browser accepts it, and its
+        strong ETag is made weak.
+        """
+        response = JsonResponse({'paragraphs': [PAGE]})
+        response['ETag'] = '"abc"'
+        content = response.content
+        response = self.compress(response, 'gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), content)
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response['ETag'], 'W/"abc"')
+
+    def test_json_is_gzipped_without_brotli(self):
+        """
+        JSON falls back to gzip if the browser does not accept brotli.
+        """
+        response = JsonResponse({'paragraphs': [PAGE]})
+        response['ETag'] = '"abc"'
+        response = self.compress(response, 'gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['ETag'], 'W/"abc"')
+
+    def test_identity_without_accept_encoding(self):
+        """
+        Responses stay uncompressed if the browser accepts no encoding.
+        """
+        response = self.compress(HttpResponse(PAGE), '')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content.decode(), PAGE)
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_other_content_types_are_not_compressed(self):
+        """
+        Only HTML and JSON are compressed.
+        """
+        response = HttpResponse(PAGE, content_type='application/octet-stream')
+        response = self.compress(response, 'gzip, br')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertFalse(response.has_header('Vary'))
+
+
+class CompressedManifestStaticFilesStorageTests(SimpleTestCase):
+    def setUp(self):
+        self.static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_root, ignore_errors=True)
+        static_settings = override_settings(
+            STATIC_ROOT=self.static_root,
+            STORAGES={
+                **settings.STORAGES,
+                'staticfiles': {'BACKEND': 'app.storage.CompressedManifestStaticFilesStorage'},
+            },
+        )
+        static_settings.enable()
+        self.addCleanup(static_settings.disable)
+
+    def test_collectstatic_writes_compressed_siblings_once(self):
+        """
+        Every final hashed text asset gets .gz (and .br) siblings, and each
+        is compressed exactly once.
+        """
+        compress = CompressedManifestStaticFilesStorage.compress
+        with mock.patch.object(
+            CompressedManifestStaticFilesStorage, 'compress', autospec=True, side_effect=compress
+        ) as mocked:
+            call_command('collectstatic', interactive=False, verbosity=0)
+        compressed = [call.args[1] for call in mocked.call_args_list]
+        self.assertEqual(len(compressed), len(set(compressed)))
+
+        storage = CompressedManifestStaticFilesStorage()
+        hashed_name = storage.stored_name('admin/css/base.css')
+        self.assertIn(hashed_name, compressed)
+        with open(os.path.join(self.static_root, hashed_name), 'rb') as f:
+            content = f.read()
+        with open(os.path.join(self.static_root, hashed_name + '.gz'), 'rb') as f:
+            self.assertEqual(gzip.decompress(f.read()), content)
+        if brotli is not None:
+            with open(os.path.join(self.static_root, hashed_name + '.br'), 'rb') as f:
+                self.assertEqual(brotli.decompress(f.read()), content)
+
+    def test_post_process_compresses_final_hashed_names(self):
+        """
+        Files yielded once per post-processing pass are compressed once,
+        under their last hashed name.
+        """
+        passes = [
+            ('a.css', 'a.111.css', True),
+            ('b.js', 'b.222.js', True),
+            ('a.css', 'a.333.css', True),
+            ('c.css', None, ValueError('broken')),
+        ]
+        storage = CompressedManifestStaticFilesStorage()
+        with mock.patch(
+            'django.contrib.staticfiles.storage.ManifestStaticFilesStorage.post_process',
+            return_value=iter(passes),
+        ), mock.patch.object(storage, 'compress') as compress:
+            self.assertEqual(list(storage.post_process({})), passes)
+        self.assertEqual(
+            [call.args[0] for call in compress.call_args_list], ['a.333.css', 'b.222.js']
+        )
+
+
+class WorkerStartupTests(SimpleTestCase):
+    def test_editor_views_do_not_import_docx(self):
+        """
+        Importing the editor views leaves python-docx unloaded.
+        """
+        code = (
+            'import sys, django; django.setup(); import editor.views; '
+            'print("docx" in sys.modules)'
+        )
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='app.settings')
+        result = subprocess.run(
+            [sys.executable, '-c', code], cwd=settings.BASE_DIR, env=env,
+            capture_output=True, text=True, check=True,
+        )
+        self.assertEqual(result.stdout.splitlines()[-1], 'False')
+
+    @override_settings(TEMPLATES=[{
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'OPTIONS': {
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    }])
+    def test_warm_up_fills_cached_loader(self):
+        """
+        warm_up() compiles the project's templates into the cached loader.
+        """
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertEqual(loader.get_template_cache, {})
+        warm_up()
+        self.assertIn('editor/edit_document.html', loader.get_template_cache)
+        self.assertIn('polls/detail.html', loader.get_template_cache)
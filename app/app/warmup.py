@@ -0,0 +1,38 @@
+"""
+Warm-up for pre-forked workers.
+
+Call warm_up() in the master process after the application is loaded and
+before workers are forked (see gunicorn.conf.py), so that every worker starts
+with the heavy imports and compiled templates already in memory.
+"""
+import importlib
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.template import engines
+from django.urls import get_resolver
+
+# Imported lazily by the editor, loaded here once for all workers.
+HEAVY_MODULES = (
+    'docx',
+    'docx.enum.style',
+    'docx.enum.text',
+    'docx.shared',
+)
+
+
+def warm_up():
+    for module in HEAVY_MODULES:
+        importlib.import_module(module)
+
+    # Populate the URL resolver and the cached template loader with the
+    # project's own templates.
+    get_resolver().url_patterns
+    engine = engines['django']
+    for app_config in apps.get_app_configs():
+        template_dir = Path(app_config.path) / 'templates'
+        if settings.BASE_DIR not in template_dir.parents or not template_dir.is_dir():
+            continue
+        for path in sorted(template_dir.rglob('*.html')):
+            engine.get_template(path.relative_to(template_dir).as_posix())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""
+Measure worker cold-start time and requests/sec of the edit and polls pages.
+
+    python benchmark.py
+    python benchmark.py --settings app.settings_production
+
+Cold start is the wall time of a fresh interpreter loading the WSGI
+application and its URLconf (which imports every view module), median of
+--runs. Requests/sec are measured in-process through the WSGI handler
+against a throwaway test database and media directory, with
+Accept-Encoding: gzip, br. The document is added through the upload view,
+so it is indexed wherever the upload view does that.
+"""
+import argparse
+import io
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def cold_start(settings, runs, warm=False):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings)
+    code = 'from app.wsgi import application\nfrom django.urls import get_resolver\nget_resolver().url_patterns'
+    if warm:
+        code += '\nfrom app.warmup import warm_up\nwarm_up()'
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], env=env, check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def requests_per_second(client, path, count):
+    client.get(path, HTTP_ACCEPT_ENCODING='gzip, br')
+    start = time.perf_counter()
+    for _ in range(count):
+        response = client.get(path, HTTP_ACCEPT_ENCODING='gzip, br')
+        assert response.status_code == 200, (path, response.status_code)
+    return count / (time.perf_counter() - start), response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--settings', default='app.settings')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ['DJANGO_SETTINGS_MODULE'] = args.settings
+    os.environ.setdefault('DJANGO_SECRET_KEY', 'benchmark')
+    os.environ.setdefault('DJANGO_ALLOWED_HOSTS', 'testserver')
+    media_root = tempfile.mkdtemp()
+
+    print(f'settings: {args.settings}')
+    print(f'cold start: {cold_start(args.settings, args.runs) * 1000:.0f} ms')
+    if args.settings != 'app.settings':
+        print(f'cold start + warm-up: {cold_start(args.settings, args.runs, warm=True) * 1000:.0f} ms')
+
+    import django
+    from django.test.utils import setup_test_environment, override_settings
+    django.setup()
+    setup_test_environment()
+
+    from django.db import connection
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.test import Client
+    from django.utils import timezone
+    from docx import Document as DocxDocument
+
+    from editor.models import Document
+    from polls.models import Question
+
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        with override_settings(MEDIA_ROOT=media_root, ALLOWED_HOSTS=['testserver']):
+            document = DocxDocument()
+            for i in range(40):
+                document.add_heading(f'Section {i}', level=1 + i % 3)
+                document.add_paragraph('Lorem ipsum dolor sit amet. ' * 20)
+            buffer = io.BytesIO()
+            document.save(buffer)
+            client = Client()
+            client.post('/docx-editor/upload/', {'file': SimpleUploadedFile('bench.docx', buffer.getvalue())})
+            doc = Document.objects.get()
+
+            question = Question.objects.create(question_text="What's new?", pub_date=timezone.now())
+            for i in range(5):
+                question.choice_set.create(choice_text=f'Choice {i}', votes=0)
+
+            for path in (f'/docx-editor/edit/{doc.id}/', '/polls/', f'/polls/{question.id}/'):
+                rps, response = requests_per_second(client, path, args.requests)
+                encoding = response.get('Content-Encoding', 'identity')
+                print(f'{path}: {rps:.0f} req/s ({len(response.content)} bytes, {encoding})')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        shutil.rmtree(media_root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,4 +4,19 @@ from .models import Document
 class DocumentForm(forms.ModelForm):
     class Meta:
         model = Document
-        fields = ('file',)
\ No newline at end of file
+        fields = ('file',)
+
+    def clean_file(self):
+        file = self.cleaned_data['file']
+        # Set by DocxUploadHandler when the upload was rejected while streaming
+        error = getattr(file, 'error', None)
+        if error:
+            raise forms.ValidationError(error)
+        return file
+
+    def save(self, commit=True):
+        file = self.cleaned_data['file']
+        self.instance.sha256 = getattr(file, 'sha256', '')
+        self.instance.paragraphs = getattr(file, 'paragraphs', [])
+        self.instance.headings = getattr(file, 'headings', [])
+        return super().save(commit)
\ No newline at end of file
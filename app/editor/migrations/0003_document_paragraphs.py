@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('editor', '0002_document_sha256_headings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='paragraphs',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
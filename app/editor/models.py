@@ -3,6 +3,9 @@ from django.db import models
 class Document(models.Model):
     file = models.FileField(upload_to='documents/')
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    sha256 = models.CharField(max_length=64, blank=True)
+    paragraphs = models.JSONField(default=list, blank=True)
+    headings = models.JSONField(default=list, blank=True)
 
     def __str__(self):
         return f'Document {self.id}'
\ No newline at end of file
@@ -1,3 +1,210 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+import zipfile
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from docx import Document as DocxDocument
+from docx.enum.style import WD_STYLE_TYPE
+
+from .models import Document
+from .upload_handlers import index_docx
+from .utils import get_paragraphs_and_headings
+
+
+def make_docx():
+    document = DocxDocument()
+    document.styles.add_style('heading x', WD_STYLE_TYPE.PARAGRAPH)
+    document.add_heading('Introduction', level=1)
+    document.add_paragraph('Not a heading', style='heading x')
+    document.add_paragraph('Some text.')
+    document.add_heading('Details', level=2)
+    table = document.add_table(rows=1, cols=1)
+    table.cell(0, 0).paragraphs[0].style = document.styles['Heading 3']
+    document.add_paragraph('More\ttext.')
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def rewrite_docx(content, drop=(), corrupt=()):
+    """
+    Copy the .docx in ``content`` without the ``drop`` members and with the
+    compressed bytes of the ``corrupt`` members scrambled.
+    """
+    source = zipfile.ZipFile(io.BytesIO(content))
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for info in source.infolist():
+            if info.filename not in drop:
+                archive.writestr(info, source.read(info.filename))
+    if not corrupt:
+        return buffer.getvalue()
+
+    data = bytearray(buffer.getvalue())
+    for info in zipfile.ZipFile(io.BytesIO(bytes(data))).infolist():
+        if info.filename in corrupt:
+            # Local header is 30 bytes plus the name and extra field
+            start = info.header_offset + 30 + len(info.filename.encode()) + len(info.extra)
+            for i in range(start + 2, start + info.compress_size - 2):
+                data[i] ^= 0x5A
+    return bytes(data)
+
+
+class UploadDocumentTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.media_root, ignore_errors=True)
+        media_settings = override_settings(MEDIA_ROOT=cls.media_root)
+        media_settings.enable()
+        cls.addClassCleanup(media_settings.disable)
+
+    def upload(self, name, content):
+        return self.client.post(
+            reverse('editor:upload_document'),
+            {'file': SimpleUploadedFile(name, content)},
+        )
+
+    def test_upload_indexes_outline(self):
+        """
+        A valid .docx is stored with its hash and the same paragraphs and
+        headings python-docx would report.
+        """
+        content = make_docx()
+        response = self.upload('report.docx', content)
+        self.assertRedirects(response, reverse('editor:list_documents'))
+
+        doc = Document.objects.get()
+        file_path = os.path.join(self.media_root, doc.file.name)
+        with open(file_path, 'rb') as f:
+            self.assertEqual(f.read(), content)
+        paragraphs, headings = get_paragraphs_and_headings(DocxDocument(file_path))
+        self.assertEqual(doc.paragraphs, paragraphs)
+        self.assertEqual(doc.headings, headings)
+        self.assertEqual([h['text'] for h in doc.headings], ['Introduction', 'Details'])
+        self.assertEqual(len(doc.sha256), 64)
+
+    def test_edit_renders_from_index(self):
+        """
+        The edit page of an indexed document does not need the file itself.
+        """
+        self.upload('report.docx', make_docx())
+        doc = Document.objects.get()
+        os.remove(os.path.join(self.media_root, doc.file.name))
+        response = self.client.get(reverse('editor:edit_document', args=[doc.id]))
+        self.assertContains(response, 'H2: Details')
+        self.assertContains(response, '[Style: heading x]')
+
+    def test_edit_parses_unindexed_document(self):
+        """
+        Documents uploaded before indexing are parsed on each request.
+        """
+        os.makedirs(os.path.join(self.media_root, 'documents'), exist_ok=True)
+        with open(os.path.join(self.media_root, 'documents', 'old.docx'), 'wb') as f:
+            f.write(make_docx())
+        doc = Document.objects.create(file='documents/old.docx')
+        response = self.client.get(reverse('editor:edit_document', args=[doc.id]))
+        self.assertContains(response, 'H1: Introduction')
+
+    def test_update_heading_refreshes_index(self):
+        """
+        Changing a paragraph style updates the stored outline and hash.
+        """
+        self.upload('report.docx', make_docx())
+        doc = Document.objects.get()
+        old_sha256 = doc.sha256
+        self.client.post(
+            reverse('editor:update_heading'),
+            {'doc_id': doc.id, 'para_index': 2, 'style_name': 'Heading 1'},
+            content_type='application/json',
+        )
+        doc.refresh_from_db()
+        self.assertNotEqual(doc.sha256, old_sha256)
+        self.assertEqual(doc.paragraphs[2]['style'], 'Heading 1')
+        self.assertIn({'index': 2, 'text': 'Some text.', 'level': 1, 'indent': 0}, doc.headings)
+
+    def assertNoTemporaryFiles(self):
+        documents_dir = os.path.join(self.media_root, 'documents')
+        names = os.listdir(documents_dir) if os.path.isdir(documents_dir) else []
+        self.assertFalse([name for name in names if '.upload' in name])
+
+    def test_upload_rejects_corrupted_member(self):
+        """
+        A zip whose document part fails to decompress is rejected with a
+        form error and leaves no temporary file behind.
+        """
+        content = rewrite_docx(make_docx(), corrupt={'word/document.xml'})
+        response = self.upload('report.docx', content)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'is not a valid .docx document')
+        self.assertFalse(Document.objects.exists())
+        self.assertNoTemporaryFiles()
+
+    def test_upload_rejects_missing_related_part(self):
+        """
+        A package missing a part its relationships point to is rejected,
+        because python-docx could not open it later.
+        """
+        content = rewrite_docx(make_docx(), drop={'word/styles.xml'})
+        response = self.upload('report.docx', content)
+        self.assertContains(response, 'missing word/styles.xml')
+        self.assertFalse(Document.objects.exists())
+        self.assertNoTemporaryFiles()
+
+    def test_upload_leaves_no_temporary_files(self):
+        """
+        The streamed upload is renamed into place, not copied.
+        """
+        self.upload('report.docx', make_docx())
+        self.assertNoTemporaryFiles()
+
+    def test_upload_rejects_non_zip(self):
+        """
+        Files that do not start with a zip header are rejected.
+        """
+        response = self.upload('report.docx', b'not a word document')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'is not a .docx document')
+        self.assertFalse(Document.objects.exists())
+
+    def test_upload_rejects_zip_without_document_part(self):
+        """
+        Zip archives without the OOXML document part are rejected.
+        """
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('[Content_Types].xml', '<Types/>')
+            archive.writestr('_rels/.rels', '<Relationships/>')
+        response = self.upload('report.docx', buffer.getvalue())
+        self.assertContains(response, 'missing word/document.xml')
+        self.assertFalse(Document.objects.exists())
+
+
+class IndexDocxTests(TestCase):
+    def test_index_matches_python_docx(self):
+        """
+        index_docx() reports the same paragraphs and headings as
+        get_paragraphs_and_headings().
+        """
+        with tempfile.NamedTemporaryFile(suffix='.docx') as f:
+            f.write(make_docx())
+            f.flush()
+            paragraphs, headings = index_docx(f.name)
+            self.assertEqual((paragraphs, headings), get_paragraphs_and_headings(DocxDocument(f.name)))
+
+    def test_index_keeps_custom_lowercase_style_names(self):
+        """
+        Only python-docx's built-in aliases are capitalised, so a custom
+        style named "heading x" is not a heading.
+        """
+        with tempfile.NamedTemporaryFile(suffix='.docx') as f:
+            f.write(make_docx())
+            f.flush()
+            paragraphs, headings = index_docx(f.name)
+        self.assertEqual(paragraphs[1], {'index': 1, 'text': 'Not a heading', 'style': 'heading x'})
+        self.assertNotIn(1, [heading['index'] for heading in headings])
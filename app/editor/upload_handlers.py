@@ -0,0 +1,271 @@
+# editor/upload_handlers.py
+
+import hashlib
+import os
+import posixpath
+import tempfile
+import zipfile
+from xml.etree import ElementTree
+
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+
+from .models import Document
+
+ZIP_MAGIC = b'PK\x03\x04'
+REQUIRED_PARTS = ('[Content_Types].xml', '_rels/.rels', 'word/document.xml')
+
+RELS_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+RELS_RELATIONSHIP = RELS_NS + 'Relationship'
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+W_BODY = W_NS + 'body'
+W_P = W_NS + 'p'
+W_PPR = W_NS + 'pPr'
+W_PSTYLE = W_NS + 'pStyle'
+W_STYLE = W_NS + 'style'
+W_NAME = W_NS + 'name'
+W_VAL = W_NS + 'val'
+W_STYLE_ID = W_NS + 'styleId'
+W_TYPE = W_NS + 'type'
+W_DEFAULT = W_NS + 'default'
+W_R = W_NS + 'r'
+W_HYPERLINK = W_NS + 'hyperlink'
+W_T = W_NS + 't'
+W_TAB = W_NS + 'tab'
+W_PTAB = W_NS + 'ptab'
+W_BR = W_NS + 'br'
+W_CR = W_NS + 'cr'
+W_NO_BREAK_HYPHEN = W_NS + 'noBreakHyphen'
+
+# Same special cases as python-docx's BabelFish; every other name is kept as is
+UI_STYLE_NAMES = {
+    'caption': 'Caption',
+    'footer': 'Footer',
+    'header': 'Header',
+    **{f'heading {level}': f'Heading {level}' for level in range(1, 10)},
+}
+
+
+class DocxUploadedFile(UploadedFile):
+    """
+    A temporary upload created next to its final storage location, so that
+    saving it to the FileField is a rename instead of a copy.
+
+    TemporaryUploadedFile always uses FILE_UPLOAD_TEMP_DIR, so its two
+    methods storage relies on are repeated here rather than subclassing it.
+    """
+
+    def __init__(self, name, content_type, size, charset, content_type_extra=None, dir=None):
+        _, ext = os.path.splitext(name)
+        file = tempfile.NamedTemporaryFile(suffix='.upload' + ext, dir=dir)
+        super().__init__(file, name, content_type, size, charset, content_type_extra)
+        self.sha256 = ''
+        self.paragraphs = []
+        self.headings = []
+        self.error = None
+
+    def temporary_file_path(self):
+        """Return the full path of this file."""
+        return self.file.name
+
+    def close(self):
+        try:
+            return self.file.close()
+        except FileNotFoundError:
+            # Already renamed into place by the storage, nothing to unlink
+            pass
+
+
+class DocxUploadHandler(FileUploadHandler):
+    """
+    Stream an uploaded .docx to disk while hashing it, reject anything that
+    is not a zip archive on the first chunk, and index its paragraph/heading
+    outline once the last chunk has been written.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        # Write into the directory the FileField will save to, so that saving
+        # it is a rename on the same filesystem.
+        field = Document._meta.get_field('file')
+        upload_dir = field.storage.path(field.upload_to)
+        os.makedirs(upload_dir, exist_ok=True)
+        self.file = DocxUploadedFile(
+            self.file_name, self.content_type, 0, self.charset, self.content_type_extra, dir=upload_dir
+        )
+        self.hasher = hashlib.sha256()
+        self.head = b''
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.file.error:
+            # Already rejected; drain the rest of the stream without storing it.
+            return None
+
+        if len(self.head) < len(ZIP_MAGIC):
+            self.head += raw_data[:len(ZIP_MAGIC) - len(self.head)]
+            if not ZIP_MAGIC.startswith(self.head):
+                self.reject('The uploaded file is not a .docx document.')
+                return None
+
+        self.hasher.update(raw_data)
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        self.file.size = file_size
+
+        if not self.file.error:
+            if len(self.head) < len(ZIP_MAGIC):
+                self.reject('The uploaded file is not a .docx document.')
+            else:
+                self.file.sha256 = self.hasher.hexdigest()
+                try:
+                    self.file.paragraphs, self.file.headings = index_docx(self.file.temporary_file_path())
+                except Exception as e:
+                    # Broken archives fail in many ways (zlib.error, EOFError,
+                    # NotImplementedError, ...). Anything escaping here would
+                    # abort request parsing and leave the temp file behind.
+                    self.reject(f'The uploaded file is not a valid .docx document: {e}')
+
+        self.file.seek(0)
+        return self.file
+
+    def reject(self, message):
+        self.file.error = message
+        self.file.truncate(0)
+
+
+def index_docx(path):
+    """
+    Validate the OOXML package at ``path`` and return its paragraphs and
+    headings in the same shape as ``get_paragraphs_and_headings``.
+
+    Only the central directory, the relationship parts and the
+    styles/document parts are read, so the rest of the archive is never
+    decompressed.
+    """
+    with zipfile.ZipFile(path) as archive:
+        names = set(archive.namelist())
+        for part in REQUIRED_PARTS:
+            if part not in names:
+                raise KeyError(f'missing {part}')
+        _check_relationships(archive, names)
+
+        style_names, default_style = {}, 'Normal'
+        if 'word/styles.xml' in names:
+            with archive.open('word/styles.xml') as f:
+                style_names, default_style = _read_paragraph_styles(f)
+
+        with archive.open('word/document.xml') as f:
+            return _read_paragraphs(f, style_names, default_style)
+
+
+def _check_relationships(archive, names):
+    # python-docx loads every internal part reachable from the package
+    # relationships and fails on the first one that is missing, so do the same.
+    pending = ['/']
+    seen = set(pending)
+    while pending:
+        source = pending.pop()
+        base_dir, filename = posixpath.split(source)
+        rels_name = posixpath.join(base_dir, '_rels', filename + '.rels').lstrip('/')
+        if rels_name not in names:
+            continue
+        with archive.open(rels_name) as f:
+            for _, elem in ElementTree.iterparse(f):
+                if elem.tag != RELS_RELATIONSHIP or elem.get('TargetMode') == 'External':
+                    continue
+                target = posixpath.normpath(posixpath.join(base_dir, elem.get('Target', '')))
+                if target.lstrip('/') not in names:
+                    raise KeyError(f'missing {target.lstrip("/")} referenced from {rels_name}')
+                if target not in seen:
+                    seen.add(target)
+                    pending.append(target)
+
+
+def _read_paragraph_styles(f):
+    style_names = {}
+    default_style = 'Normal'
+    for _, elem in ElementTree.iterparse(f):
+        if elem.tag != W_STYLE:
+            continue
+        if elem.get(W_TYPE) == 'paragraph':
+            name = elem.find(W_NAME)
+            if name is not None:
+                # Word stores some built-in names in lower case ("heading 1")
+                # which python-docx reports capitalised ("Heading 1").
+                internal_name = name.get(W_VAL, '')
+                ui_name = UI_STYLE_NAMES.get(internal_name, internal_name)
+                style_names[elem.get(W_STYLE_ID)] = ui_name
+                if elem.get(W_DEFAULT) in ('1', 'true', 'on'):
+                    default_style = ui_name
+        elem.clear()  # only whole styles, their children are still needed above
+    return style_names, default_style
+
+
+def _read_paragraphs(f, style_names, default_style):
+    paragraphs = []
+    headings = []
+    depth = 0
+    body_depth = None
+    for event, elem in ElementTree.iterparse(f, events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            if elem.tag == W_BODY:
+                body_depth = depth
+            continue
+
+        depth -= 1
+        if body_depth is None or depth != body_depth:
+            continue
+        if elem.tag != W_P:
+            elem.clear()
+            continue
+
+        # Body-level paragraph, same set python-docx exposes as document.paragraphs
+        i = len(paragraphs)
+        text = _paragraph_text(elem)
+        pstyle = elem.find(f'{W_PPR}/{W_PSTYLE}')
+        style = default_style
+        if pstyle is not None:
+            style = style_names.get(pstyle.get(W_VAL), default_style)
+        paragraphs.append({'index': i, 'text': text, 'style': style})
+
+        if style.startswith('Heading '):
+            try:
+                level = int(style.replace('Heading ', ''))
+            except ValueError:
+                level = 1  # Default to level 1 if parsing fails
+            indent = (level - 1) * 20  # Calculate indentation
+            headings.append({'index': i, 'text': text, 'level': level, 'indent': indent})
+        elem.clear()
+    return paragraphs, headings
+
+
+def _paragraph_text(paragraph):
+    # Mirrors python-docx: runs and hyperlinked runs directly in the paragraph
+    runs = []
+    for child in paragraph:
+        if child.tag == W_R:
+            runs.append(child)
+        elif child.tag == W_HYPERLINK:
+            runs.extend(child.findall(W_R))
+
+    text = []
+    for run in runs:
+        for elem in run:
+            if elem.tag == W_T:
+                text.append(elem.text or '')
+            elif elem.tag in (W_TAB, W_PTAB):
+                text.append('\t')
+            elif elem.tag == W_CR:
+                text.append('\n')
+            elif elem.tag == W_BR:
+                # Page and column breaks have no text equivalent
+                if elem.get(W_TYPE, 'textWrapping') == 'textWrapping':
+                    text.append('\n')
+            elif elem.tag == W_NO_BREAK_HYPHEN:
+                text.append('-')
+    return ''.join(text)
@@ -1,21 +1,21 @@
 # editor/utils.py
 
-import os
-from docx import Document as DocxDocument
-from docx.shared import Pt, Cm
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.enum.style import WD_STYLE_TYPE
+# python-docx is imported inside the functions below so that importing the
+# editor app does not pull in docx/lxml at worker startup.
 
-# Define heading formats
+# Define heading formats (alignment is a WD_ALIGN_PARAGRAPH member name)
 heading_formats = {
-    1: {'bold': True, 'italic': False, 'alignment': WD_ALIGN_PARAGRAPH.CENTER},
-    2: {'bold': True, 'italic': False, 'alignment': WD_ALIGN_PARAGRAPH.LEFT},
-    3: {'bold': True, 'italic': True, 'alignment': WD_ALIGN_PARAGRAPH.LEFT},
-    4: {'bold': False, 'italic': True, 'alignment': WD_ALIGN_PARAGRAPH.LEFT},
-    5: {'bold': False, 'italic': True, 'alignment': WD_ALIGN_PARAGRAPH.LEFT}
+    1: {'bold': True, 'italic': False, 'alignment': 'CENTER'},
+    2: {'bold': True, 'italic': False, 'alignment': 'LEFT'},
+    3: {'bold': True, 'italic': True, 'alignment': 'LEFT'},
+    4: {'bold': False, 'italic': True, 'alignment': 'LEFT'},
+    5: {'bold': False, 'italic': True, 'alignment': 'LEFT'}
 }
 
 def format_document(doc):
+    from docx.shared import Pt, Cm
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+
     # 1. Font: Set the entire document's font to Times New Roman.
     for paragraph in doc.paragraphs:
         for run in paragraph.runs:
@@ -53,6 +53,9 @@ def format_document(doc):
     return doc
 
 def set_normal_style(doc):
+    from docx.shared import Pt
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+
     normal_style = doc.styles['Normal']
     normal_style.font.name = 'Times New Roman'
     normal_style.font.size = Pt(14)
@@ -61,6 +64,10 @@ def set_normal_style(doc):
     return doc
 
 def set_heading_styles(doc):
+    from docx.shared import Pt, Cm
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.enum.style import WD_STYLE_TYPE
+
     styles = doc.styles
     for level in heading_formats:
         style_name = f'Heading {level}'
@@ -76,7 +83,7 @@ def set_heading_styles(doc):
         style.font.italic = heading_formats[level]['italic']
         style.font.name = 'Times New Roman'
         style.font.size = Pt(13)
-        style.paragraph_format.alignment = heading_formats[level]['alignment']
+        style.paragraph_format.alignment = getattr(WD_ALIGN_PARAGRAPH, heading_formats[level]['alignment'])
         style.paragraph_format.line_spacing = 1.5  # Set line spacing to 1.5
         if level in [1, 2]:
             style.paragraph_format.first_line_indent = Cm(0)  # No indent for Heading 1 and 2
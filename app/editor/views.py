@@ -1,3 +1,5 @@
+import hashlib
+import io
 import json
 import os
 
@@ -6,13 +8,12 @@ from django.contrib import messages
 from django.http import JsonResponse, HttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
-from django.views.decorators.csrf import csrf_protect
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.views.decorators.http import require_POST
-from docx import Document as DocxDocument
-from docx.enum.style import WD_STYLE_TYPE
 
 from .forms import DocumentForm
 from .models import Document
+from .upload_handlers import DocxUploadHandler
 from .utils import (
     format_document,
     set_normal_style,
@@ -21,12 +22,41 @@ from .utils import (
 )
 
 
+def _open_document(file_path):
+    # python-docx (and lxml) is imported on first use so workers start fast;
+    # app.warmup loads it up front for pre-forked servers.
+    from docx import Document as DocxDocument
+    return DocxDocument(file_path)
+
+
+def _save_document(doc, document, file_path):
+    # Keep the hash and outline index from the upload in sync with the file
+    buffer = io.BytesIO()
+    document.save(buffer)
+    data = buffer.getvalue()
+    with open(file_path, 'wb') as f:
+        f.write(data)
+
+    doc.sha256 = hashlib.sha256(data).hexdigest()
+    doc.paragraphs, doc.headings = get_paragraphs_and_headings(document)
+    doc.save(update_fields=['sha256', 'paragraphs', 'headings'])
+
+
 def list_documents(request):
     documents = Document.objects.all()
     return render(request, 'editor/list_documents.html', {'documents': documents})
 
 
+@csrf_exempt
 def upload_document(request):
+    # Handlers must be swapped before CsrfViewMiddleware reads request.POST,
+    # so CSRF is checked by the inner view instead.
+    request.upload_handlers = [DocxUploadHandler(request)]
+    return _upload_document(request)
+
+
+@csrf_protect
+def _upload_document(request):
     if request.method == 'POST':
         form = DocumentForm(request.POST, request.FILES)
         if form.is_valid():
@@ -54,11 +84,16 @@ def delete_document(request, doc_id):
 
 def edit_document(request, doc_id):
     doc = get_object_or_404(Document, id=doc_id)
-    file_path = os.path.join(settings.MEDIA_ROOT, doc.file.name)
-    document = DocxDocument(file_path)
+    if doc.sha256:
+        # Indexed on upload and kept current by _save_document
+        paragraphs, headings = doc.paragraphs, doc.headings
+    else:
+        # Uploaded before documents were indexed
+        file_path = os.path.join(settings.MEDIA_ROOT, doc.file.name)
+        document = _open_document(file_path)
 
-    # Use utility function to get paragraphs and headings
-    paragraphs, headings = get_paragraphs_and_headings(document)
+        # Use utility function to get paragraphs and headings
+        paragraphs, headings = get_paragraphs_and_headings(document)
 
     context = {
         'document': doc,
@@ -79,7 +114,7 @@ def update_heading(request):
 
             doc = get_object_or_404(Document, id=doc_id)
             file_path = os.path.join(settings.MEDIA_ROOT, doc.file.name)
-            document = DocxDocument(file_path)
+            document = _open_document(file_path)
 
             # Try to access the style directly
             try:
@@ -87,6 +122,7 @@ def update_heading(request):
             except KeyError:
                 # Style doesn't exist, create it if it's a heading style
                 if style_name.startswith('Heading '):
+                    from docx.enum.style import WD_STYLE_TYPE
                     new_style = document.styles.add_style(style_name, WD_STYLE_TYPE.PARAGRAPH)
                     new_style.base_style = document.styles['Normal']
 
@@ -104,7 +140,7 @@ def update_heading(request):
             para.style = style
 
             # Save the document
-            document.save(file_path)
+            _save_document(doc, document, file_path)
 
             return JsonResponse({'status': 'success'})
         except Exception as e:
@@ -117,7 +153,7 @@ def update_heading(request):
 def apply_format(request, doc_id):
     doc = get_object_or_404(Document, id=doc_id)
     file_path = os.path.join(settings.MEDIA_ROOT, doc.file.name)
-    document = DocxDocument(file_path)
+    document = _open_document(file_path)
 
     # Apply formatting functions
     document = format_document(document)
@@ -125,7 +161,7 @@ def apply_format(request, doc_id):
     document = set_heading_styles(document)
 
     # Save the formatted document
-    document.save(file_path)
+    _save_document(doc, document, file_path)
 
     return redirect(reverse('editor:edit_document', args=[doc_id]))
 
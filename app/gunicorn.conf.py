@@ -0,0 +1,18 @@
+# gunicorn -c gunicorn.conf.py app.wsgi
+#
+# Load the application once in the master and warm it up before forking, so
+# workers share its memory and serve their first request at full speed.
+import multiprocessing
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings_production')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+preload_app = True
+
+
+def when_ready(server):
+    from app.warmup import warm_up
+
+    warm_up()